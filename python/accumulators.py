@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Online Metric Accumulators for Stock Market Indices Analysis
+
+Recomputing the return and volatility metrics from the full history costs
+O(n) per index on every refresh. A MetricAccumulator instead keeps running
+state over a sliding window of bars, so both appending a new bar and
+evicting the oldest one update every metric in (amortized) constant time:
+
+- first and last values of the window,
+- Welford mean and variance of the periodic returns, with the reverse
+  update when the oldest return leaves the window,
+- the maximum drawdown of the window, kept in a two-stack queue whose
+  entries carry (max, min, max drawdown) aggregates of their segment.
+
+The fetcher asks for a rolling 10-year history, so each new month both adds
+a bar and drops the oldest one; the accumulator follows that window and its
+results match a full recomputation over the same bars. The state (including
+the window values, which eviction needs) is persisted as JSON in the build
+cache and reused by the next build. Only the bars at the edges of the window
+are compared with the new series; a full comparison, which catches revised
+bars anywhere in the history, is opt-in.
+
+The most recent bar of a fetch is usually a partial month whose value still
+changes, so it is never committed to the persisted state: it is only folded
+into the metrics of the current build and replaced by the next fetch.
+"""
+
+import os
+import json
+import math
+
+# Periods per year of the monthly data
+PERIODS_PER_YEAR = 12
+
+
+def _segment(value):
+    """Drawdown aggregate [max, min, max drawdown] of a single value"""
+    return [value, value, 0.0]
+
+
+def _combine(older, newer):
+    """Drawdown aggregate of two adjacent segments (older first); None is empty"""
+    if older is None:
+        return newer
+    if newer is None:
+        return older
+    return [
+        max(older[0], newer[0]),
+        min(older[1], newer[1]),
+        # The deepest fall across the boundary is from the older peak to the newer trough
+        min(older[2], newer[2], newer[1] / older[0] - 1),
+    ]
+
+
+class MetricAccumulator:
+    """Running statistics of a sliding window of values, updated one bar at a time"""
+
+    def __init__(self):
+        self.count = 0
+        self.first_date = None
+        self.first_value = None
+        self.last_date = None
+        self.last_value = None
+        # Welford state of the periodic returns
+        self.return_count = 0
+        self.return_mean = 0.0
+        self.return_m2 = 0.0
+        # Window as a two-stack queue: ``front`` holds the oldest bars (oldest
+        # last) with the aggregate of each bar and every newer bar in front;
+        # ``back`` holds the newest bars in order with one running aggregate.
+        self.front = []
+        self.back = []
+        self.back_aggregate = None
+
+    def update(self, date, value):
+        """Append one bar
+
+        Args:
+            date (str): Bar date (YYYY-MM), later than any bar already added
+            value (float): Closing value of the bar
+        """
+        if self.count == 0:
+            self.first_date = date
+            self.first_value = value
+        else:
+            self._add_return(value / self.last_value - 1)
+
+        self.back.append([date, value])
+        self.back_aggregate = _combine(self.back_aggregate, _segment(value))
+        self.count += 1
+        self.last_date = date
+        self.last_value = value
+
+    def evict(self):
+        """Remove the oldest bar of the window"""
+        if not self.front:
+            # Move the back stack over, building suffix aggregates newest first
+            for date, value in reversed(self.back):
+                aggregate = _segment(value)
+                if self.front:
+                    aggregate = _combine(aggregate, self.front[-1][2])
+                self.front.append([date, value, aggregate])
+            self.back = []
+            self.back_aggregate = None
+
+        _, oldest_value, _ = self.front.pop()
+        self.count -= 1
+        if self.count == 0:
+            self.__init__()
+            return
+
+        next_date, next_value = self._oldest()
+        self._remove_return(next_value / oldest_value - 1)
+        self.first_date = next_date
+        self.first_value = next_value
+
+    def _oldest(self):
+        if self.front:
+            return self.front[-1][0], self.front[-1][1]
+        return self.back[0][0], self.back[0][1]
+
+    def _add_return(self, periodic_return):
+        self.return_count += 1
+        delta = periodic_return - self.return_mean
+        self.return_mean += delta / self.return_count
+        self.return_m2 += delta * (periodic_return - self.return_mean)
+
+    def _remove_return(self, periodic_return):
+        if self.return_count <= 1:
+            self.return_count, self.return_mean, self.return_m2 = 0, 0.0, 0.0
+            return
+        previous_mean = self.return_mean
+        self.return_count -= 1
+        self.return_mean = (previous_mean * (self.return_count + 1) - periodic_return) / self.return_count
+        self.return_m2 = max(0.0, self.return_m2 - (periodic_return - previous_mean) * (periodic_return - self.return_mean))
+
+    def window(self):
+        """Return the (date, value) pairs of the window, oldest first"""
+        pairs = [(date, value) for date, value, _ in reversed(self.front)]
+        pairs.extend((date, value) for date, value in self.back)
+        return pairs
+
+    def _window_aggregate(self):
+        front_aggregate = self.front[-1][2] if self.front else None
+        return _combine(front_aggregate, self.back_aggregate)
+
+    def metrics(self, pending=None):
+        """Return the metrics of the window
+
+        Args:
+            pending (tuple, optional): (date, value) of a provisional bar that is
+                included in the metrics without being committed
+
+        Returns:
+            dict: startValue, endValue, totalReturn, annualizedReturn, volatility and maxDrawdown
+        """
+        count = self.count
+        last_value = self.last_value
+        return_count, return_m2 = self.return_count, self.return_m2
+        aggregate = self._window_aggregate()
+
+        if pending is not None:
+            value = pending[1]
+            if count == 0:
+                first_value = value
+            else:
+                first_value = self.first_value
+                # One Welford step on local copies
+                periodic_return = value / last_value - 1
+                return_count += 1
+                delta = periodic_return - self.return_mean
+                return_m2 += delta * (periodic_return - (self.return_mean + delta / return_count))
+            count += 1
+            last_value = value
+            aggregate = _combine(aggregate, _segment(value))
+        else:
+            first_value = self.first_value
+
+        total_return = last_value / first_value - 1
+        annualized_return = (1 + total_return) ** (1 / (count / PERIODS_PER_YEAR)) - 1
+        # Population standard deviation, as np.std
+        variance = return_m2 / return_count if return_count else 0.0
+        volatility = math.sqrt(variance) * math.sqrt(PERIODS_PER_YEAR)  # Annualized
+
+        return {
+            "startValue": float(first_value),
+            "endValue": float(last_value),
+            "totalReturn": float(total_return),
+            "annualizedReturn": float(annualized_return),
+            "volatility": float(volatility),
+            "maxDrawdown": float(aggregate[2]),
+        }
+
+    def to_dict(self):
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, state):
+        accumulator = cls()
+        for key, value in state.items():
+            setattr(accumulator, key, value)
+        return accumulator
+
+
+def load_accumulator(path):
+    """Load a persisted accumulator, or return an empty one if none exists"""
+    try:
+        with open(path, "r") as f:
+            return MetricAccumulator.from_dict(json.load(f))
+    except (FileNotFoundError, ValueError, TypeError):
+        return MetricAccumulator()
+
+
+def save_accumulator(accumulator, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(accumulator.to_dict(), f)
+
+
+def advance(accumulator, monthly_data_list, verify=False):
+    """Move the accumulator's window onto a newly fetched series
+
+    Evicts the bars that fell out of the start of the series and returns the
+    points after the last committed bar. This costs time proportional to the
+    number of bars that changed, not to the length of the series: only the
+    first and last committed bars are compared with the series.
+
+    Args:
+        accumulator (MetricAccumulator): Accumulator of the previous build
+        monthly_data_list (list): Newly fetched monthly data points
+        verify (bool): Also compare every committed bar with the series (O(n))
+
+    Returns:
+        list or None: The new points, or None if the series does not continue
+        the committed window (e.g. a committed bar was revised), in which
+        case the accumulator has to be rebuilt.
+    """
+    if accumulator.count == 0:
+        return list(monthly_data_list)
+
+    # Find the last committed bar, scanning back from the end
+    position = len(monthly_data_list) - 1
+    while position >= 0 and monthly_data_list[position]["date"] > accumulator.last_date:
+        position -= 1
+    if position < 0:
+        return None
+    point = monthly_data_list[position]
+    if point["date"] != accumulator.last_date or point["value"] != accumulator.last_value:
+        return None
+
+    # Drop the bars before the start of the series
+    first_point = monthly_data_list[0]
+    while accumulator.count > 0 and accumulator.first_date < first_point["date"]:
+        accumulator.evict()
+    if (
+        accumulator.count != position + 1
+        or accumulator.first_date != first_point["date"]
+        or accumulator.first_value != first_point["value"]
+    ):
+        return None
+
+    if verify:
+        # Adjusted closes can be revised anywhere in the history
+        for (date, value), point in zip(accumulator.window(), monthly_data_list):
+            if date != point["date"] or value != point["value"]:
+                return None
+
+    return monthly_data_list[position + 1:]
+
+
+def apply_series(accumulator, monthly_data_list, verify=False):
+    """
+    Bring an accumulator up to date with a newly fetched series
+
+    Bars added at the end and bars dropped from the start since the last
+    build are applied in (amortized) constant time each; the accumulator is
+    rebuilt from the full series only when the series does not continue the
+    committed window.
+
+    Args:
+        accumulator (MetricAccumulator): Accumulator of the previous build
+        monthly_data_list (list): Monthly data points ({"date": "YYYY-MM", "value": float})
+        verify (bool): Compare every committed bar with the series, see advance
+
+    Returns:
+        tuple: (accumulator, pending) where pending is the (date, value) of the
+            uncommitted latest bar, or None
+    """
+    points = advance(accumulator, monthly_data_list, verify)
+    if points is None:
+        accumulator = type(accumulator)()
+        points = list(monthly_data_list)
+
+    # Commit all but the latest bar, which may still be revised
+    for point in points[:-1]:
+        accumulator.update(point["date"], point["value"])
+
+    if not points:
+        # Nothing after the committed window
+        return accumulator, None
+    return accumulator, (points[-1]["date"], points[-1]["value"])
+
+
+def update_metrics(monthly_data_list, accumulator_path, verify=False):
+    """
+    Calculate the metrics of a series using the persisted accumulator
+
+    Args:
+        monthly_data_list (list): Monthly data points ({"date": "YYYY-MM", "value": float})
+        accumulator_path (str): JSON file holding the accumulator state
+        verify (bool): Compare every committed bar with the series, see advance
+
+    Returns:
+        dict: Metrics, see MetricAccumulator.metrics
+    """
+    accumulator, pending = apply_series(load_accumulator(accumulator_path), monthly_data_list, verify)
+    save_accumulator(accumulator, accumulator_path)
+    return accumulator.metrics(pending)
+
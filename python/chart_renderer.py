@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Chart Renderer for Stock Market Indices Analysis
+
+This module renders the report charts with matplotlib's object-oriented API.
+Each chart type gets a figure template (figure, canvas, axes, labels, grid,
+formatters and locators) that is built once and then reused: rendering a new
+chart only swaps the plotted data. No global pyplot state is touched, so one
+renderer per thread can be used safely in parallel.
+"""
+
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure, SubplotParams
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import PolyCollection
+import matplotlib.dates as mdates
+
+# Default figure settings (match the original pyplot charts)
+FIGURE_SIZE = (8, 5)
+DEFAULT_DPI = 300
+PRIMARY_COLOR = '#1e3c72'
+DEFAULT_SUBPLOT_PARAMS = {
+    key: getattr(SubplotParams(), key)
+    for key in ("left", "bottom", "right", "top", "wspace", "hspace")
+}
+
+
+def normalized_series(index):
+    """Return the dates (as matplotlib date numbers) and values of an index normalized to 100
+
+    Args:
+        index (dict): Index data with a ``monthlyData`` list
+
+    Returns:
+        tuple: (numpy array of date numbers, numpy array of normalized values)
+    """
+    monthly_data = index['monthlyData']
+    dates = pd.to_datetime([point['date'] for point in monthly_data])
+    values = np.array([point['value'] for point in monthly_data], dtype=float)
+    return mdates.date2num(dates.to_pydatetime()), values / values[0] * 100
+
+
+class ChartTemplate:
+    """Figure, canvas and axes for one chart type, built once and reused"""
+
+    def __init__(self, figsize=FIGURE_SIZE):
+        self.figure = Figure(figsize=figsize)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.ax = self.figure.add_subplot(1, 1, 1)
+        self.title = self.ax.set_title("", fontsize=14, fontweight='bold')
+
+    def set_time_axis(self):
+        """Configure the x axis for yearly date ticks"""
+        self.ax.xaxis_date()
+        self.ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y'))
+        self.ax.xaxis.set_major_locator(mdates.YearLocator(2))
+
+    def layout(self):
+        """Compute the tight layout for the current data
+
+        Tick label widths change with the data, so the layout is recomputed
+        on every render. It starts from the default subplot parameters, which
+        makes the result independent of what the template drew before.
+        """
+        self.figure.subplots_adjust(**DEFAULT_SUBPLOT_PARAMS)
+        self.figure.tight_layout()
+
+    def to_image(self, dpi=DEFAULT_DPI, image_format='png', quality=None, optimize=False):
+        """Render the figure to an image held in memory
+
+        Args:
+            dpi (int): Raster resolution
+            image_format (str): "png" or "jpeg"
+            quality (int, optional): JPEG quality (1-95)
+            optimize (bool): Let Pillow optimize the encoded image
+
+        Returns:
+            BytesIO: The image data
+        """
+        pil_kwargs = {"optimize": optimize}
+        if image_format == 'jpeg' and quality is not None:
+            pil_kwargs["quality"] = quality
+
+        img_data = BytesIO()
+        self.figure.savefig(img_data, format=image_format, dpi=dpi, pil_kwargs=pil_kwargs)
+        img_data.seek(0)
+        return img_data
+
+
+class ChartRenderer:
+    """Render report charts from reusable per-type figure templates
+
+    A renderer is not thread-safe; create one renderer per worker thread.
+    """
+
+    CHART_TYPES = ("performance", "volatility", "individual")
+
+    def __init__(self, figsize=FIGURE_SIZE, dpi=DEFAULT_DPI):
+        self.figsize = figsize
+        self.dpi = dpi
+        self._templates = {}
+
+    def render(self, indices_data, chart_type, selected_indices=None, dpi=None,
+               image_format='png', quality=None, optimize=False):
+        """Render a chart and return it as image data
+
+        Args:
+            indices_data (list): List of indices data
+            chart_type (str): Type of chart to generate
+            selected_indices (list, optional): Specific indices to include
+            dpi (int, optional): Raster resolution (defaults to the renderer's dpi)
+            image_format, quality, optimize: Encoding options, see ChartTemplate.to_image
+
+        Returns:
+            BytesIO: The image data
+        """
+        if chart_type not in self.CHART_TYPES:
+            raise ValueError(f"Unknown chart type: {chart_type}")
+
+        template = self._get_template(chart_type)
+        getattr(self, f"_draw_{chart_type}")(template, indices_data, selected_indices)
+        return template.to_image(dpi or self.dpi, image_format, quality, optimize)
+
+    def close(self):
+        """Release all figure templates"""
+        self._templates.clear()
+
+    def _get_template(self, chart_type):
+        """Return the template for a chart type, building it on first use"""
+        template = self._templates.get(chart_type)
+        if template is None:
+            template = ChartTemplate(self.figsize)
+            getattr(self, f"_build_{chart_type}")(template)
+            self._templates[chart_type] = template
+        return template
+
+    # Template builders: static axes setup done once per chart type
+
+    def _build_performance(self, template):
+        ax = template.ax
+        template.title.set_text("10-Year Performance Comparison (2013-2023)")
+        ax.set_xlabel("Year", fontsize=10)
+        ax.set_ylabel("Normalized Value (Starting = 100)", fontsize=10)
+        ax.grid(True, alpha=0.3)
+        template.set_time_axis()
+
+    def _build_volatility(self, template):
+        ax = template.ax
+        template.title.set_text("Risk-Return Profile of Global Indices (2013-2023)")
+        ax.set_xlabel("Volatility (Annualized Standard Deviation, %)", fontsize=10)
+        ax.set_ylabel("Annualized Return (%)", fontsize=10)
+        ax.grid(True, alpha=0.3)
+
+    def _build_individual(self, template):
+        ax = template.ax
+        ax.set_xlabel("Year", fontsize=10)
+        ax.set_ylabel("Normalized Value (Starting = 100)", fontsize=10)
+        ax.grid(True, alpha=0.3)
+        template.set_time_axis()
+
+        # Persistent artists whose data is swapped for each index
+        template.line, = ax.plot([], [], linewidth=2, color=PRIMARY_COLOR)
+        template.fill = PolyCollection([], color=PRIMARY_COLOR, alpha=0.2)
+        ax.add_collection(template.fill, autolim=False)
+
+    # Data drawing: only the per-chart artists change between renders
+
+    def _clear_artists(self, ax):
+        """Remove the data artists drawn by a previous render"""
+        for artist in list(ax.lines) + list(ax.collections) + list(ax.texts):
+            artist.remove()
+        legend = ax.get_legend()
+        if legend is not None:
+            legend.remove()
+        ax.set_prop_cycle(None)
+        ax.relim()
+        ax.set_autoscale_on(True)
+
+    def _draw_performance(self, template, indices_data, selected_indices):
+        ax = template.ax
+        self._clear_artists(ax)
+
+        indices_to_plot = selected_indices if selected_indices else indices_data[:5]
+        for index in indices_to_plot:
+            dates, normalized_values = normalized_series(index)
+            ax.plot(dates, normalized_values, label=index['name'], linewidth=2)
+
+        ax.legend(loc='best', fontsize=9)
+        ax.autoscale_view()
+        template.layout()
+
+    def _draw_volatility(self, template, indices_data, selected_indices):
+        ax = template.ax
+        self._clear_artists(ax)
+
+        x = [index["volatility"] * 100 for index in indices_data]
+        y = [index["annualizedReturn"] * 100 for index in indices_data]
+        labels = [index["name"] for index in indices_data]
+
+        ax.scatter(x, y, s=100, alpha=0.7)
+
+        # Add index labels
+        for i, label in enumerate(labels):
+            ax.annotate(label, (x[i], y[i]), fontsize=8,
+                        xytext=(5, 5), textcoords='offset points')
+
+        # Add a diagonal line representing the efficient frontier (simplified)
+        min_x, max_x = ax.get_xlim()
+        min_y, max_y = ax.get_ylim()
+        ax.plot([min_x, max_x], [min_y, max_y], 'k--', alpha=0.3)
+        template.layout()
+
+    def _draw_individual(self, template, indices_data, selected_indices):
+        ax = template.ax
+        index = selected_indices[0]
+        dates, normalized_values = normalized_series(index)
+
+        # Swap the line and fill data in place
+        template.line.set_data(dates, normalized_values)
+        polygon = np.column_stack((
+            np.concatenate((dates, dates[::-1])),
+            np.concatenate((normalized_values, np.full(len(dates), 100.0))),
+        ))
+        template.fill.set_verts([polygon])
+        template.title.set_text(f"{index['name']} Performance (2013-2023)")
+
+        # Rescale to the new data, keeping the fill baseline in view
+        ax.relim()
+        ax.update_datalim([(dates[0], 100.0)])
+        ax.autoscale_view()
+        template.layout()
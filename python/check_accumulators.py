@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Accumulator Check for Stock Market Indices Analysis
+
+Runs a random monthly series through successive incremental builds and
+compares each result with data_fetcher's full recomputation. The builds
+cover a bar appended, the provisional last bar revised, the window shifted
+by one month and a committed bar revised. Each incremental build must touch
+only the bars that changed.
+
+Calls are counted by a subclass of MetricAccumulator, so the shared class
+is never modified.
+"""
+
+import sys
+import json
+import random
+
+from accumulators import MetricAccumulator, apply_series
+from data_fetcher import compute_index_metrics
+from indices import INDICES
+
+# Largest accepted difference between incremental and full results
+TOLERANCE = 1e-9
+
+
+class CountingAccumulator(MetricAccumulator):
+    """MetricAccumulator that counts its updates and evictions"""
+
+    def __init__(self):
+        super().__init__()
+        self.reset_counts()
+
+    def reset_counts(self):
+        self.updates = 0
+        self.evictions = 0
+
+    def update(self, date, value):
+        self.updates += 1
+        super().update(date, value)
+
+    def evict(self):
+        self.evictions += 1
+        super().evict()
+
+
+def random_series(months, seed=1):
+    """Return a random monthly series ({"date": "YYYY-MM", "value": float})"""
+    rng = random.Random(seed)
+    values = [100.0]
+    for _ in range(months - 1):
+        values.append(round(values[-1] * (1 + rng.gauss(0.005, 0.04)), 2))
+    return [
+        {"date": f"{2000 + i // 12}-{i % 12 + 1:02d}", "value": value}
+        for i, value in enumerate(values)
+    ]
+
+
+def check_builds(months=120):
+    """
+    Compare incremental builds with the full recomputation
+
+    Args:
+        months (int): Length of the rolling window
+
+    Returns:
+        list: Error messages (empty if every build passed)
+    """
+    series = random_series(months + 2)
+    revised_last = [dict(point) for point in series[:months + 1]]
+    revised_last[-1]["value"] = round(revised_last[-1]["value"] * 1.01, 2)
+    revised_history = [dict(point) for point in series[1:months + 2]]
+    revised_history[months // 2]["value"] += 1.0
+
+    # (name, series, verify, largest accepted number of updates or evictions)
+    builds = [
+        ("initial", series[:months], False, None),
+        ("appended bar", series[:months + 1], False, 1),
+        ("revised last bar", revised_last, False, 0),
+        ("shifted window", series[1:months + 2], False, 1),
+        ("revised committed bar", revised_history, True, None),
+    ]
+
+    errors = []
+    accumulator = CountingAccumulator()
+    for name, data, verify, max_calls in builds:
+        # Round-trip the state through JSON, as between two builds
+        accumulator = CountingAccumulator.from_dict(json.loads(json.dumps(accumulator.to_dict())))
+        accumulator.reset_counts()
+
+        accumulator, pending = apply_series(accumulator, data, verify)
+        incremental = accumulator.metrics(pending)
+        full = compute_index_metrics(INDICES[0], data)
+        difference = max(abs(incremental[key] - full[key]) for key in incremental)
+
+        print(f"{name}: {accumulator.updates} updates, {accumulator.evictions} evictions, "
+              f"max difference {difference:.2e}")
+        if max_calls is not None and max(accumulator.updates, accumulator.evictions) > max_calls:
+            errors.append(f"{name} processed more bars than changed")
+        if difference > TOLERANCE:
+            errors.append(f"{name} does not match the full recomputation")
+
+    return errors
+
+
+if __name__ == "__main__":
+    errors = check_builds()
+    if errors:
+        for error in errors:
+            print(f"Error: {error}")
+        sys.exit(1)
+    print("\nAccumulator check passed!")
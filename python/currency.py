@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Currency Normalization for Stock Market Indices Analysis
+
+The indices are quoted in their local currencies, so comparing their returns
+mixes in exchange rate effects. This module fetches (or loads) each required
+FX series once per build, aligns all index values into a single price panel
+(months x indices) and converts the whole panel into every report currency
+with one NumPy broadcast. Metrics are then computed column-wise on the
+converted panels, so USD and EUR versions cost about the same as one.
+"""
+
+import os
+import json
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from indices import REPORT_CURRENCIES, BASE_CURRENCY
+
+
+def fx_symbol(currency):
+    """Return the Yahoo Finance ticker quoting a currency in USD (e.g. JPYUSD=X)"""
+    return f"{currency}{BASE_CURRENCY}=X"
+
+
+def fetch_fx_series(currency):
+    """
+    Fetch 10 years of monthly USD rates for one currency
+
+    Args:
+        currency (str): ISO currency code
+
+    Returns:
+        list: Monthly data points ({"date": "YYYY-MM", "value": float})
+    """
+    ticker = yf.Ticker(fx_symbol(currency))
+    fx_data = ticker.history(period="10y", interval="1mo", auto_adjust=True)
+
+    # Rates such as JPY/USD are small, so they are not rounded
+    return [
+        {"date": date.strftime("%Y-%m"), "value": float(close)}
+        for date, close in fx_data["Close"].items()
+    ]
+
+
+def load_fx_rates(currencies, cache_path="../.build", refresh=False):
+    """
+    Load the monthly USD rates of the given currencies, fetching each series at most once
+
+    Series are cached as JSON files in ``<cache_path>/fx`` and reused unless
+    ``refresh`` is set.
+
+    Args:
+        currencies (iterable): ISO currency codes
+        cache_path (str): Directory of the intermediate build files
+        refresh (bool): Fetch the series again even if cached
+
+    Returns:
+        pd.DataFrame: USD per unit of currency, indexed by month (YYYY-MM), one column per currency
+    """
+    fx_path = os.path.join(cache_path, "fx")
+    os.makedirs(fx_path, exist_ok=True)
+
+    rates = {}
+    for currency in sorted(set(currencies)):
+        if currency == BASE_CURRENCY:
+            continue
+
+        cache_file = os.path.join(fx_path, f"{currency}.json")
+        if os.path.exists(cache_file) and not refresh:
+            with open(cache_file, "r") as f:
+                series = json.load(f)
+        else:
+            print(f"Fetching FX rates for {currency}...")
+            series = fetch_fx_series(currency)
+            with open(cache_file, "w") as f:
+                json.dump(series, f, indent=2)
+
+        rates[currency] = pd.Series(
+            [point["value"] for point in series],
+            index=[point["date"] for point in series],
+        )
+
+    fx_rates = pd.DataFrame(rates).sort_index()
+    fx_rates[BASE_CURRENCY] = 1.0
+    return fx_rates
+
+
+def build_price_panel(indices_data):
+    """
+    Align the monthly values of all indices into a single panel
+
+    Args:
+        indices_data (list): Index data objects with ``monthlyData``
+
+    Returns:
+        pd.DataFrame: Values indexed by month (YYYY-MM), one column per index symbol
+    """
+    return pd.DataFrame({
+        index["symbol"]: pd.Series(
+            [point["value"] for point in index["monthlyData"]],
+            index=[point["date"] for point in index["monthlyData"]],
+        )
+        for index in indices_data
+    }).sort_index()
+
+
+def convert_panel(panel, currencies, fx_rates, targets=REPORT_CURRENCIES):
+    """
+    Convert a local-currency price panel into several currencies at once
+
+    Args:
+        panel (pd.DataFrame): Local-currency values (months x index symbols)
+        currencies (list): Local currency of each panel column
+        fx_rates (pd.DataFrame): USD per unit of currency (months x currencies)
+        targets (tuple): Currencies to convert to
+
+    Returns:
+        dict: Target currency -> converted panel
+    """
+    # Align the FX rates to the panel dates, carrying the last rate forward
+    rates = fx_rates.reindex(panel.index).ffill()
+    local_rates = rates[list(currencies)].to_numpy()   # months x indices
+    target_rates = rates[list(targets)].to_numpy()     # months x targets
+
+    # (1, months, indices) * (1, months, indices) / (targets, months, 1)
+    converted = panel.to_numpy()[None, :, :] * local_rates[None, :, :] / target_rates.T[:, :, None]
+
+    return {
+        target: pd.DataFrame(converted[i], index=panel.index, columns=panel.columns)
+        for i, target in enumerate(targets)
+    }
+
+
+def panel_metrics(panel):
+    """
+    Calculate returns and volatility for every column of a price panel
+
+    Matches the per-index calculation in data_fetcher: total return from the
+    first to the last value, annualized over the number of months, and
+    annualized standard deviation of monthly returns.
+
+    Args:
+        panel (pd.DataFrame): Values (months x index symbols)
+
+    Returns:
+        pd.DataFrame: startValue, endValue, totalReturn, annualizedReturn, volatility and
+            maxDrawdown per symbol
+    """
+    start_values = panel.bfill().iloc[0]
+    end_values = panel.ffill().iloc[-1]
+    months = panel.count()
+
+    total_return = end_values / start_values - 1
+    annualized_return = (1 + total_return) ** (12 / months) - 1
+    volatility = panel.pct_change(fill_method=None).std(ddof=0) * np.sqrt(12)  # Annualized
+    max_drawdown = (panel / panel.cummax() - 1).min()
+
+    return pd.DataFrame({
+        "startValue": start_values,
+        "endValue": end_values,
+        "totalReturn": total_return,
+        "annualizedReturn": annualized_return,
+        "volatility": volatility,
+        "maxDrawdown": max_drawdown,
+    })
+
+
+def convert_indices_data(indices_data, fx_rates, targets=REPORT_CURRENCIES):
+    """
+    Create the index data objects of every target currency
+
+    Args:
+        indices_data (list): Local-currency index data objects (with ``currency``)
+        fx_rates (pd.DataFrame): USD per unit of currency, see load_fx_rates
+        targets (tuple): Currencies to convert to
+
+    Returns:
+        dict: Target currency -> list of index data objects in that currency
+    """
+    if not indices_data:
+        return {target: [] for target in targets}
+
+    panel = build_price_panel(indices_data)
+    currencies = [index["currency"] for index in indices_data]
+    converted = convert_panel(panel, currencies, fx_rates, targets)
+
+    results = {}
+    for target, target_panel in converted.items():
+        metrics = panel_metrics(target_panel)
+        results[target] = []
+        for index in indices_data:
+            column = target_panel[index["symbol"]].dropna().round(2)
+            if column.empty:
+                print(f"No {target} rates available for {index['name']}. Skipping...")
+                continue
+            row = metrics.loc[index["symbol"]]
+            results[target].append({
+                "symbol": index["symbol"],
+                "name": index["name"],
+                "country": index["country"],
+                "currency": target,
+                "localCurrency": index["currency"],
+                "startValue": float(row["startValue"]),
+                "endValue": float(row["endValue"]),
+                "totalReturn": float(row["totalReturn"]),
+                "annualizedReturn": float(row["annualizedReturn"]),
+                "volatility": float(row["volatility"]),
+                "maxDrawdown": float(row["maxDrawdown"]),
+                "monthlyData": [
+                    {"date": date, "value": float(value)}
+                    for date, value in zip(column.index, column.to_numpy())
+                ]
+            })
+
+    return results
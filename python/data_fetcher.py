@@ -14,21 +14,188 @@ import yfinance as yf
 import time
 import numpy as np
 
-# List of major indices to analyze with their Yahoo Finance tickers
-INDICES = [
-    {"symbol": "^GSPC", "name": "S&P 500", "country": "United States"},
-    {"symbol": "^DJI", "name": "Dow Jones Industrial Average", "country": "United States"},
-    {"symbol": "^IXIC", "name": "NASDAQ Composite", "country": "United States"},
-    {"symbol": "^FTSE", "name": "FTSE 100", "country": "United Kingdom"},
-    {"symbol": "^GDAXI", "name": "DAX", "country": "Germany"},
-    {"symbol": "^FCHI", "name": "CAC 40", "country": "France"},
-    {"symbol": "^N225", "name": "Nikkei 225", "country": "Japan"},
-    {"symbol": "^HSI", "name": "Hang Seng Index", "country": "Hong Kong"},
-    {"symbol": "000001.SS", "name": "Shanghai Composite", "country": "China"},
-    {"symbol": "^BSESN", "name": "BSE SENSEX", "country": "India"}
-]
+from indices import INDICES, index_file_stem, aggregate_file_names
+from currency import REPORT_CURRENCIES, load_fx_rates, convert_indices_data
+from accumulators import update_metrics
 
-def fetch_indices_data(start_date, end_date, save_path="../src/data"):
+def fetch_monthly_data(index):
+    """
+    Fetch 10 years of monthly closing values for one index
+    
+    Args:
+        index (dict): Entry from INDICES
+    
+    Returns:
+        list: Monthly data points ({"date": "YYYY-MM", "value": float}), empty if unavailable
+    """
+    # Fetch data from Yahoo Finance
+    ticker = yf.Ticker(index["symbol"])
+    ticker_data = ticker.history(
+        period="10y",
+        interval="1mo",
+        auto_adjust=True,
+    )
+    
+    # If the data is empty, try again with a different interval
+    if ticker_data.empty:
+        print(f"No data found for {index['name']} using monthly interval. Trying weekly...")
+        ticker_data = ticker.history(
+            period="10y",
+            interval="1wk",
+            auto_adjust=True,
+        )
+        # Resample to monthly
+        if not ticker_data.empty:
+            ticker_data = ticker_data.resample('ME').last()
+    
+    # Process monthly data
+    monthly_data_list = []
+    
+    for date, row in ticker_data.iterrows():
+        monthly_data_list.append({
+            "date": date.strftime("%Y-%m"),
+            "value": round(float(row["Close"]), 2)
+        })
+    
+    return monthly_data_list
+
+def compute_index_metrics(index, monthly_data_list, accumulator_path=None, verify_history=False):
+    """
+    Calculate returns and volatility for one index
+    
+    Args:
+        index (dict): Entry from INDICES
+        monthly_data_list (list): Monthly data points from fetch_monthly_data
+        accumulator_path (str, optional): File of the index's persisted metric
+            accumulator; when given, only bars added since the last build are processed
+        verify_history (bool): Compare every bar of the persisted accumulator with
+            the series, rebuilding it if any bar was revised
+    
+    Returns:
+        dict: Index data object with metrics and monthly data
+    """
+    if accumulator_path:
+        metrics = update_metrics(monthly_data_list, accumulator_path, verify_history)
+    else:
+        # Calculate returns and volatility from the full history
+        values = np.array([point["value"] for point in monthly_data_list])
+        returns = np.diff(values) / values[:-1]
+        total_return = (values[-1] / values[0]) - 1
+        annualized_return = (1 + total_return) ** (1 / (len(values) / 12)) - 1
+        volatility = np.std(returns) * np.sqrt(12)  # Annualized
+        max_drawdown = np.min(values / np.maximum.accumulate(values) - 1)
+        metrics = {
+            "startValue": float(values[0]),
+            "endValue": float(values[-1]),
+            "totalReturn": float(total_return),
+            "annualizedReturn": float(annualized_return),
+            "volatility": float(volatility),
+            "maxDrawdown": float(max_drawdown)
+        }
+    
+    # Create index data object
+    return {
+        "symbol": index["symbol"],
+        "name": index["name"],
+        "country": index["country"],
+        "currency": index["currency"],
+        **metrics,
+        "monthlyData": monthly_data_list
+    }
+
+def accumulator_file(cache_path, symbol):
+    """Return the path of the persisted metric accumulator of an index"""
+    return os.path.join(cache_path, "accumulators", f"{index_file_stem(symbol)}.json")
+
+def summarize_index(index_data):
+    """Return the summary entry (metrics without monthly data) for an index"""
+    return {
+        "symbol": index_data["symbol"],
+        "name": index_data["name"],
+        "country": index_data["country"],
+        "currency": index_data["currency"],
+        "totalReturn": index_data["totalReturn"],
+        "annualizedReturn": index_data["annualizedReturn"],
+        "volatility": index_data["volatility"]
+    }
+
+def write_aggregates(all_indices_data, save_path, currency=None):
+    """
+    Save the combined index data and the sorted summary
+    
+    Args:
+        all_indices_data (list): Index data objects
+        save_path (str): Directory to save the data files
+        currency (str, optional): Report currency of the data (None = local currencies)
+    
+    Returns:
+        list: Summary sorted from best to worst performer
+    """
+    all_indices_file, summary_file = aggregate_file_names(currency)
+    
+    # Save all indices data to a single JSON file
+    with open(f"{save_path}/{all_indices_file}", 'w') as f:
+        json.dump(all_indices_data, f, indent=2)
+    
+    # Create a sorted summary (best to worst performers)
+    summary_data = [summarize_index(index_data) for index_data in all_indices_data]
+    sorted_summary = sorted(summary_data, key=lambda x: x['totalReturn'], reverse=True)
+    
+    with open(f"{save_path}/{summary_file}", 'w') as f:
+        json.dump(sorted_summary, f, indent=2)
+    
+    return sorted_summary
+
+def converted_file_paths(save_path, currencies=REPORT_CURRENCIES):
+    """
+    Return the paths of every file written by write_currency_aggregates
+    
+    Args:
+        save_path (str): Directory of the data files
+        currencies (tuple): Report currencies
+    
+    Returns:
+        list: Per-index, combined data and summary file paths of each currency
+    """
+    paths = []
+    for currency in currencies:
+        paths.extend(
+            f"{save_path}/{index_file_stem(index['symbol'])}_{currency}.json" for index in INDICES
+        )
+        paths.extend(f"{save_path}/{name}" for name in aggregate_file_names(currency))
+    return paths
+
+def write_currency_aggregates(all_indices_data, save_path, cache_path, currencies=REPORT_CURRENCIES,
+                              refresh_fx=False):
+    """
+    Save the index data, combined data and summary converted to each report currency
+    
+    Each index is also written to its own ``<stem>_<CCY>.json`` file, so
+    consumers of one index do not depend on the others. The converted files
+    of the previous run are removed first, so a failed conversion never
+    leaves stale data next to the fresh local-currency files.
+    
+    Args:
+        all_indices_data (list): Local-currency index data objects
+        save_path (str): Directory to save the data files
+        cache_path (str): Directory of the intermediate build files (FX rate cache)
+        currencies (tuple): Report currencies to convert to
+        refresh_fx (bool): Fetch the FX series again even if cached
+    """
+    for path in converted_file_paths(save_path, currencies):
+        if os.path.exists(path):
+            os.remove(path)
+    
+    needed = {index_data["currency"] for index_data in all_indices_data} | set(currencies)
+    fx_rates = load_fx_rates(needed, cache_path, refresh=refresh_fx)
+    
+    for currency, converted_data in convert_indices_data(all_indices_data, fx_rates, currencies).items():
+        for index_data in converted_data:
+            with open(f"{save_path}/{index_file_stem(index_data['symbol'])}_{currency}.json", 'w') as f:
+                json.dump(index_data, f, indent=2)
+        write_aggregates(converted_data, save_path, currency)
+
+def fetch_indices_data(start_date, end_date, save_path="../src/data", cache_path="../.build"):
     """
     Fetch historical data for all indices and save to JSON files
     
@@ -36,6 +203,8 @@ def fetch_indices_data(start_date, end_date, save_path="../src/data"):
         start_date (str): Start date in YYYY-MM-DD format
         end_date (str): End date in YYYY-MM-DD format
         save_path (str): Directory to save the data files
+        cache_path (str): Directory of the intermediate build files (FX rates, accumulators);
+            kept out of save_path so it is not published with the site
     
     Returns:
         dict: Summary of the fetched data
@@ -45,88 +214,29 @@ def fetch_indices_data(start_date, end_date, save_path="../src/data"):
     
     # Empty list to store processed data for all indices
     all_indices_data = []
-    summary_data = []
     
     for index in INDICES:
         print(f"Fetching data for {index['name']}...")
         
         try:
-            # Fetch data from Yahoo Finance
-            ticker = yf.Ticker(index["symbol"])
-            ticker_data = ticker.history(
-                period="10y",
-                interval="1mo",
-                auto_adjust=True,
-            )
-            
-            # If the data is empty, try again with a different interval
-            if ticker_data.empty:
-                print(f"No data found for {index['name']} using monthly interval. Trying weekly...")
-                ticker_data = ticker.history(
-                    period="10y",
-                    interval="1wk",
-                    auto_adjust=True,
-                )
-                # Resample to monthly
-                if not ticker_data.empty:
-                    ticker_data = ticker_data.resample('ME').last()
-            
-            # Skip if still no data
-            if ticker_data.empty:
-                print(f"No data available for {index['name']}. Skipping...")
-                continue
-            
-            # Process monthly data
-            monthly_data_list = []
-            
-            for date, row in ticker_data.iterrows():
-                monthly_data_list.append({
-                    "date": date.strftime("%Y-%m"),
-                    "value": round(float(row["Close"]), 2)
-                })
+            monthly_data_list = fetch_monthly_data(index)
             
             # Skip if no data points
             if not monthly_data_list:
-                print(f"No valid data points for {index['name']}. Skipping...")
+                print(f"No data available for {index['name']}. Skipping...")
                 continue
             
-            # Calculate returns and volatility
-            values = np.array([point["value"] for point in monthly_data_list])
-            returns = np.diff(values) / values[:-1]
-            total_return = (values[-1] / values[0]) - 1
-            annualized_return = (1 + total_return) ** (1 / (len(values) / 12)) - 1
-            volatility = np.std(returns) * np.sqrt(12)  # Annualized
-            
-            # Create index data object
-            index_data = {
-                "symbol": index["symbol"],
-                "name": index["name"],
-                "country": index["country"],
-                "startValue": float(values[0]),
-                "endValue": float(values[-1]),
-                "totalReturn": float(total_return),
-                "annualizedReturn": float(annualized_return),
-                "volatility": float(volatility),
-                "monthlyData": monthly_data_list
-            }
+            index_data = compute_index_metrics(
+                index, monthly_data_list, accumulator_file(cache_path, index["symbol"])
+            )
             
             # Save individual index data to JSON file
-            with open(f"{save_path}/{index['symbol'].replace('^', '').replace('.', '_')}.json", 'w') as f:
+            with open(f"{save_path}/{index_file_stem(index['symbol'])}.json", 'w') as f:
                 json.dump(index_data, f, indent=2)
             
             # Add to all indices data
             all_indices_data.append(index_data)
             
-            # Add to summary data
-            summary_data.append({
-                "symbol": index["symbol"],
-                "name": index["name"],
-                "country": index["country"],
-                "totalReturn": float(total_return),
-                "annualizedReturn": float(annualized_return),
-                "volatility": float(volatility)
-            })
-            
             print(f"Successfully processed {index['name']}.")
             
             # Add a small delay to avoid rate limiting
@@ -135,15 +245,13 @@ def fetch_indices_data(start_date, end_date, save_path="../src/data"):
         except Exception as e:
             print(f"Error processing {index['name']}: {str(e)}")
     
-    # Save all indices data to a single JSON file
-    with open(f"{save_path}/all_indices.json", 'w') as f:
-        json.dump(all_indices_data, f, indent=2)
+    sorted_summary = write_aggregates(all_indices_data, save_path)
     
-    # Create a sorted summary (best to worst performers)
-    sorted_summary = sorted(summary_data, key=lambda x: x['totalReturn'], reverse=True)
-    
-    with open(f"{save_path}/summary.json", 'w') as f:
-        json.dump(sorted_summary, f, indent=2)
+    # Save currency-normalized versions of the data
+    try:
+        write_currency_aggregates(all_indices_data, save_path, cache_path, refresh_fx=True)
+    except Exception as e:
+        print(f"Error converting currencies: {str(e)}")
     
     return {
         "indices_count": len(all_indices_data),
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Index Definitions for Stock Market Indices Analysis
+
+This module lists the stock market indices covered by the report. It has no
+third-party imports so that it can be loaded cheaply by every script.
+"""
+
+# List of major indices to analyze with their Yahoo Finance tickers and quote currencies
+INDICES = [
+    {"symbol": "^GSPC", "name": "S&P 500", "country": "United States", "currency": "USD"},
+    {"symbol": "^DJI", "name": "Dow Jones Industrial Average", "country": "United States", "currency": "USD"},
+    {"symbol": "^IXIC", "name": "NASDAQ Composite", "country": "United States", "currency": "USD"},
+    {"symbol": "^FTSE", "name": "FTSE 100", "country": "United Kingdom", "currency": "GBP"},
+    {"symbol": "^GDAXI", "name": "DAX", "country": "Germany", "currency": "EUR"},
+    {"symbol": "^FCHI", "name": "CAC 40", "country": "France", "currency": "EUR"},
+    {"symbol": "^N225", "name": "Nikkei 225", "country": "Japan", "currency": "JPY"},
+    {"symbol": "^HSI", "name": "Hang Seng Index", "country": "Hong Kong", "currency": "HKD"},
+    {"symbol": "000001.SS", "name": "Shanghai Composite", "country": "China", "currency": "CNY"},
+    {"symbol": "^BSESN", "name": "BSE SENSEX", "country": "India", "currency": "INR"}
+]
+
+# Currencies the report can be normalized to (besides local currency)
+REPORT_CURRENCIES = ("USD", "EUR")
+
+# Base currency of the FX series (all rates are USD per unit of currency)
+BASE_CURRENCY = "USD"
+
+def index_file_stem(symbol):
+    """Return the file name stem used for an index symbol (e.g. ^GSPC -> GSPC)"""
+    return symbol.replace('^', '').replace('.', '_')
+
+def aggregate_file_names(currency=None):
+    """Return the combined data and summary file names for a report currency (None = local)"""
+    suffix = f"_{currency}" if currency else ""
+    return f"all_indices{suffix}.json", f"summary{suffix}.json"
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Bar Ingestion for Stock Market Indices Analysis
+
+This script downloads daily or intraday history for the indices in long
+date ranges. Providers cap how much intraday history a single request may
+return, so each range is split into provider-sized chunks that are fetched
+concurrently. Chunks are consumed in order and streamed through aggregators
+that build daily, weekly and monthly OHLC bars with volume on the fly.
+Finished bars are appended to CSV files in the on-disk store, so the raw
+series is never held in memory as a whole. The files only replace the
+previous store once every chunk of the symbol has been ingested.
+"""
+
+import os
+import csv
+import time
+import argparse
+import datetime
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import yfinance as yf
+
+from indices import INDICES, index_file_stem
+
+# Default location of the aggregated bar store
+STORE_PATH = "../src/data/bars"
+
+# Maximum days of history per request for each provider interval
+CHUNK_DAYS = {
+    "1m": 7,
+    "2m": 60,
+    "5m": 60,
+    "15m": 60,
+    "30m": 60,
+    "60m": 730,
+    "90m": 60,
+    "1h": 730,
+    "1d": 3650,
+}
+
+# Maximum age in days of the history the provider keeps for each interval
+# (None = no limit). Older chunks come back empty, so ranges are clamped.
+MAX_LOOKBACK_DAYS = {
+    "1m": 30,
+    "2m": 60,
+    "5m": 60,
+    "15m": 60,
+    "30m": 60,
+    "60m": 730,
+    "90m": 60,
+    "1h": 730,
+    "1d": None,
+}
+
+# Output resolutions: pandas period frequency and label format
+RESOLUTIONS = {
+    "daily": ("D", "%Y-%m-%d"),
+    "weekly": ("W", "%Y-%m-%d"),
+    "monthly": ("M", "%Y-%m"),
+}
+
+BAR_FIELDS = ["date", "open", "high", "low", "close", "volume"]
+
+# Minimum seconds between two requests to the provider
+REQUEST_DELAY = 1.0
+
+
+def clamp_start_date(start_date, interval, today=None):
+    """Move a start date forward to the oldest day the provider keeps for an interval
+
+    Args:
+        start_date (datetime.date): Requested first day
+        interval (str): Provider interval, e.g. "1h" or "1d"
+        today (datetime.date, optional): Reference day (defaults to today)
+
+    Returns:
+        datetime.date: The start date, clamped to the provider's lookback
+    """
+    if interval not in MAX_LOOKBACK_DAYS:
+        raise ValueError(f"Unsupported interval: {interval}")
+
+    lookback = MAX_LOOKBACK_DAYS[interval]
+    if lookback is None:
+        return start_date
+
+    # Stay one day inside the limit so the oldest chunk is not rejected
+    oldest = (today or datetime.date.today()) - datetime.timedelta(days=lookback - 1)
+    if start_date < oldest:
+        print(f"Warning: {interval} history is only kept for {lookback} days; "
+              f"starting at {oldest} instead of {start_date}.")
+        return oldest
+    return start_date
+
+
+def chunk_ranges(start_date, end_date, interval):
+    """Split a date range into chunks the provider accepts in one request
+
+    Args:
+        start_date (datetime.date): First day of the range
+        end_date (datetime.date): Day after the last day of the range (exclusive)
+        interval (str): Provider interval, e.g. "1h" or "1d"
+
+    Returns:
+        list: (chunk_start, chunk_end) pairs with exclusive ends
+    """
+    if interval not in CHUNK_DAYS:
+        raise ValueError(f"Unsupported interval: {interval}")
+
+    step = datetime.timedelta(days=CHUNK_DAYS[interval])
+    chunks = []
+    chunk_start = start_date
+    while chunk_start < end_date:
+        chunk_end = min(chunk_start + step, end_date)
+        chunks.append((chunk_start, chunk_end))
+        chunk_start = chunk_end
+    return chunks
+
+
+def fetch_chunk(symbol, chunk_start, chunk_end, interval):
+    """Fetch one chunk of bars from Yahoo Finance
+
+    Returns:
+        pd.DataFrame: Bars indexed by timestamp (may be empty)
+    """
+    ticker = yf.Ticker(symbol)
+    return ticker.history(
+        start=chunk_start.strftime("%Y-%m-%d"),
+        end=chunk_end.strftime("%Y-%m-%d"),
+        interval=interval,
+        auto_adjust=True,
+    )
+
+
+class RequestPacer:
+    """Space out requests to the provider, across all worker threads"""
+
+    def __init__(self, delay=REQUEST_DELAY):
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._last_request = None
+
+    def wait(self):
+        """Block until the delay since the previous request has passed"""
+        with self._lock:
+            if self._last_request is not None:
+                delay = self._last_request + self.delay - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            self._last_request = time.monotonic()
+
+
+def iter_chunks(symbol, chunks, interval, max_workers=4, pacer=None):
+    """Fetch chunks concurrently and yield them in chronological order
+
+    At most ``max_workers`` chunks are in flight or buffered at any time, and
+    the requests start at least ``pacer.delay`` seconds apart.
+    """
+    pacer = pacer or RequestPacer()
+
+    def paced_fetch(chunk_start, chunk_end):
+        pacer.wait()
+        return fetch_chunk(symbol, chunk_start, chunk_end, interval)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        chunk_iter = iter(chunks)
+
+        # Prime the window
+        for chunk_start, chunk_end in chunk_iter:
+            pending.append(executor.submit(paced_fetch, chunk_start, chunk_end))
+            if len(pending) >= max_workers:
+                break
+
+        while pending:
+            data = pending.popleft().result()
+            next_chunk = next(chunk_iter, None)
+            if next_chunk is not None:
+                pending.append(executor.submit(paced_fetch, *next_chunk))
+            yield data
+
+
+class CsvBarSink:
+    """Append finished bars to a CSV file in the bar store
+
+    Bars are written to a temporary file next to ``path``, which replaces the
+    store file on commit(). Closing an uncommitted sink discards the
+    temporary file and leaves the previous store file untouched.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.temp_path = f"{path}.tmp"
+        self._file = open(self.temp_path, "w", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(BAR_FIELDS)
+        self.count = 0
+
+    def write(self, bar):
+        self._writer.writerow([
+            bar["date"],
+            round(bar["open"], 4),
+            round(bar["high"], 4),
+            round(bar["low"], 4),
+            round(bar["close"], 4),
+            int(bar["volume"]),
+        ])
+        self.count += 1
+
+    def commit(self):
+        """Close the file and move it into place"""
+        self._file.close()
+        os.replace(self.temp_path, self.path)
+
+    def close(self):
+        """Discard the file unless it was committed"""
+        if not self._file.closed:
+            self._file.close()
+            os.remove(self.temp_path)
+
+
+class BarAggregator:
+    """Aggregate a stream of bars into OHLCV bars at a coarser resolution
+
+    Only the bar currently being built is kept in memory. Each completed bar
+    is passed to the sink as soon as a later bar starts.
+    """
+
+    def __init__(self, resolution, sink):
+        self.freq, self.label_format = RESOLUTIONS[resolution]
+        self.sink = sink
+        self.current = None
+
+    def update(self, bars):
+        """Fold a chronologically ordered chunk of bars into the aggregate"""
+        if bars.empty:
+            return
+
+        # Bucket by the exchange-local calendar
+        timestamps = bars.index
+        if timestamps.tz is not None:
+            timestamps = timestamps.tz_localize(None)
+        keys = timestamps.to_period(self.freq).strftime(self.label_format)
+
+        partials = bars.groupby(keys, sort=False).agg(
+            open=("Open", "first"),
+            high=("High", "max"),
+            low=("Low", "min"),
+            close=("Close", "last"),
+            volume=("Volume", "sum"),
+        )
+
+        for key, row in zip(partials.index, partials.itertuples(index=False)):
+            if self.current is not None and self.current["date"] == key:
+                self.current["high"] = max(self.current["high"], row.high)
+                self.current["low"] = min(self.current["low"], row.low)
+                self.current["close"] = row.close
+                self.current["volume"] += row.volume
+                continue
+
+            if self.current is not None:
+                self.sink.write(self.current)
+            self.current = {
+                "date": key,
+                "open": row.open,
+                "high": row.high,
+                "low": row.low,
+                "close": row.close,
+                "volume": row.volume,
+            }
+
+    def finish(self):
+        """Flush the bar still being built"""
+        if self.current is not None:
+            self.sink.write(self.current)
+            self.current = None
+
+
+def ingest_symbol(symbol, start_date, end_date, interval="1h",
+                  resolutions=("daily", "weekly", "monthly"),
+                  store_path=STORE_PATH, max_workers=4, pacer=None):
+    """Stream one symbol's history into the bar store
+
+    The symbol's store files are only replaced if every chunk was fetched.
+
+    Args:
+        symbol (str): Yahoo Finance ticker
+        start_date (datetime.date): First day to fetch
+        end_date (datetime.date): Day after the last day to fetch
+        interval (str): Provider interval of the raw bars
+        resolutions (tuple): Output resolutions to build
+        store_path (str): Directory of the bar store
+        max_workers (int): Concurrent chunk downloads
+        pacer (RequestPacer, optional): Pacing shared with other downloads
+
+    Returns:
+        dict: Number of bars written per resolution
+    """
+    os.makedirs(store_path, exist_ok=True)
+    file_stem = index_file_stem(symbol)
+
+    sinks = {}
+    aggregators = []
+    try:
+        for resolution in resolutions:
+            sink = CsvBarSink(os.path.join(store_path, f"{file_stem}_{resolution}.csv"))
+            sinks[resolution] = sink
+            aggregators.append(BarAggregator(resolution, sink))
+
+        last_timestamp = None
+        chunks = chunk_ranges(clamp_start_date(start_date, interval), end_date, interval)
+        for (chunk_start, chunk_end), data in zip(chunks, iter_chunks(symbol, chunks, interval, max_workers, pacer)):
+            if data.empty:
+                print(f"Warning: no {interval} bars returned for {symbol} "
+                      f"from {chunk_start} to {chunk_end}.")
+                continue
+
+            # Drop rows repeated at chunk boundaries
+            data = data.sort_index()
+            if last_timestamp is not None:
+                data = data[data.index > last_timestamp]
+                if data.empty:
+                    continue
+            last_timestamp = data.index[-1]
+
+            for aggregator in aggregators:
+                aggregator.update(data)
+
+        for aggregator in aggregators:
+            aggregator.finish()
+        for sink in sinks.values():
+            sink.commit()
+    finally:
+        for sink in sinks.values():
+            sink.close()
+
+    return {resolution: sink.count for resolution, sink in sinks.items()}
+
+
+def ingest_indices(start_date, end_date, interval="1h",
+                   resolutions=("daily", "weekly", "monthly"),
+                   store_path=STORE_PATH, max_workers=4, request_delay=REQUEST_DELAY):
+    """Stream every index in INDICES into the bar store
+
+    All downloads share one pacer, so requests start at least
+    ``request_delay`` seconds apart.
+
+    Returns:
+        dict: Bars written per resolution, keyed by symbol
+    """
+    pacer = RequestPacer(request_delay)
+    results = {}
+    for index in INDICES:
+        print(f"Ingesting {interval} bars for {index['name']}...")
+        try:
+            results[index["symbol"]] = ingest_symbol(
+                index["symbol"], start_date, end_date, interval,
+                resolutions, store_path, max_workers, pacer
+            )
+            print(f"Successfully ingested {index['name']}: {results[index['symbol']]}")
+        except Exception as e:
+            print(f"Error ingesting {index['name']}: {str(e)}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest daily or intraday bars into the bar store")
+    parser.add_argument("--interval", default="1h", choices=sorted(CHUNK_DAYS),
+                        help="Provider interval of the raw bars")
+    parser.add_argument("--years", type=int, default=2,
+                        help="Number of years of history to ingest")
+    parser.add_argument("--resolutions", nargs="+", default=list(RESOLUTIONS),
+                        choices=list(RESOLUTIONS), help="Output resolutions")
+    parser.add_argument("--store", default=STORE_PATH, help="Bar store directory")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent chunk downloads")
+    parser.add_argument("--request-delay", type=float, default=REQUEST_DELAY,
+                        help="Minimum seconds between provider requests")
+    args = parser.parse_args()
+
+    end_date = datetime.date.today() + datetime.timedelta(days=1)
+    start_date = end_date - datetime.timedelta(days=365 * args.years)
+
+    print(f"Ingesting {args.interval} bars from {start_date} to {end_date}")
+    ingest_indices(start_date, end_date, args.interval, tuple(args.resolutions),
+                   args.store, args.workers, args.request_delay)
+    print("\nIngestion Complete!")
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Output Profiles for Stock Market Indices Analysis
+
+Named profiles that trade PDF size and build time against image quality.
+Each profile sets the raster resolution of the charts in pixels per placed
+inch and how chart images are encoded. Page compression is always on, since
+it shrinks every PDF at negligible build cost.
+"""
+
+# Placed size of the charts in the report (inches)
+CHART_WIDTH, CHART_HEIGHT = 6.5, 4
+THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT = 3, 2
+
+OUTPUT_PROFILES = {
+    # Small, fast downloads for on-screen reading: low resolution JPEG charts
+    "screen": {"ppi": 110, "image_format": "jpeg", "quality": 85, "optimize": True},
+    # Lossless charts at typical print resolution
+    "print": {"ppi": 300, "image_format": "png", "quality": None, "optimize": True},
+    # Maximum fidelity for long-term storage
+    "archive": {"ppi": 600, "image_format": "png", "quality": None, "optimize": False},
+}
+DEFAULT_PROFILE = "print"
+
+# File extension of each image format
+IMAGE_EXTENSIONS = {"png": "png", "jpeg": "jpg"}
+
+def get_output_profile(name):
+    """Return the output profile with the given name
+    
+    Raises:
+        ValueError: If the profile does not exist
+    """
+    if name not in OUTPUT_PROFILES:
+        raise ValueError(f"Unknown output profile: {name} (choose from {', '.join(OUTPUT_PROFILES)})")
+    return OUTPUT_PROFILES[name]
@@ -8,26 +8,30 @@ of major stock market indices over the past 10 years.
 
 import os
 import json
+import argparse
 import datetime
+import threading
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib.enums import TA_JUSTIFY, TA_LEFT, TA_CENTER, TA_RIGHT
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-import pandas as pd
-import numpy as np
-from io import BytesIO
 import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend
+from chart_renderer import ChartRenderer, FIGURE_SIZE
+from indices import REPORT_CURRENCIES, aggregate_file_names
+from output_profiles import (OUTPUT_PROFILES, DEFAULT_PROFILE, get_output_profile,
+                             CHART_WIDTH, CHART_HEIGHT, THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT)
 
 # Set some constants
 REPORT_TITLE = "Global Stock Market Indices: 10-Year Performance Analysis"
 DATA_PATH = "../src/data"
 OUTPUT_FILE = "../Stock_Market_Indices_Report.pdf"
 
+# Per-thread chart renderers (figure templates are not thread-safe)
+_thread_state = threading.local()
+
 # Create custom styles
 def get_custom_styles():
     """Create and return custom paragraph styles for the report"""
@@ -99,105 +103,91 @@ def get_custom_styles():
     return styles
 
 # Generate charts using matplotlib
-def generate_chart(indices_data, chart_type, filename, selected_indices=None):
+def get_chart_renderer():
+    """Return the chart renderer for the current thread, creating it on first use"""
+    renderer = getattr(_thread_state, "chart_renderer", None)
+    if renderer is None:
+        renderer = ChartRenderer()
+        _thread_state.chart_renderer = renderer
+    return renderer
+
+def chart_dpi(profile, placed_width):
+    """Return the dpi that rasterizes a chart at the profile's resolution for its placed width
+    
+    Args:
+        profile (dict): Output profile
+        placed_width (float): Width of the chart in the report (inches)
+    
+    Returns:
+        int: Figure dpi
+    """
+    return max(1, round(profile["ppi"] * placed_width / FIGURE_SIZE[0]))
+
+def generate_chart(indices_data, chart_type, filename, selected_indices=None,
+                   profile=DEFAULT_PROFILE, placed_width=CHART_WIDTH):
     """Generate charts for the report
     
+    Figure templates are reused across calls, so only the chart data is
+    redrawn for each index.
+    
     Args:
         indices_data (list): List of indices data
         chart_type (str): Type of chart to generate
         filename (str): Output filename
         selected_indices (list, optional): Specific indices to include
+        profile (str): Name of the output profile
+        placed_width (float): Width of the chart in the report (inches)
     
     Returns:
-        str: Path to the generated chart image
+        BytesIO: The generated chart image
     """
-    plt.figure(figsize=(8, 5))
+    settings = get_output_profile(profile)
+    return get_chart_renderer().render(
+        indices_data, chart_type, selected_indices,
+        dpi=chart_dpi(settings, placed_width),
+        image_format=settings["image_format"],
+        quality=settings["quality"],
+        optimize=settings["optimize"],
+    )
+
+def get_chart_image(chart_images, key, indices_data, chart_type, filename, selected_indices=None,
+                    profile=DEFAULT_PROFILE, placed_width=CHART_WIDTH):
+    """Return a pre-rendered chart image if one was provided, otherwise render it
     
-    if chart_type == "performance":
-        # Create a line chart comparing index performance
-        indices_to_plot = selected_indices if selected_indices else indices_data[:5]
-        
-        for index in indices_to_plot:
-            # Convert monthly data to DataFrame
-            dates = [pd.to_datetime(point['date']) for point in index['monthlyData']]
-            values = [point['value'] for point in index['monthlyData']]
-            # Calculate normalized values (starting at 100)
-            normalized_values = [value / values[0] * 100 for value in values]
-            plt.plot(dates, normalized_values, label=index['name'], linewidth=2)
-        
-        plt.title("10-Year Performance Comparison (2013-2023)", fontsize=14, fontweight='bold')
-        plt.xlabel("Year", fontsize=10)
-        plt.ylabel("Normalized Value (Starting = 100)", fontsize=10)
-        plt.grid(True, alpha=0.3)
-        plt.legend(loc='best', fontsize=9)
-        plt.gca().xaxis.set_major_formatter(mdates.DateFormatter('%Y'))
-        plt.gca().xaxis.set_major_locator(mdates.YearLocator(2))
-    
-    elif chart_type == "volatility":
-        # Create a scatter plot of volatility vs. returns
-        x = [index["volatility"] * 100 for index in indices_data]
-        y = [index["annualizedReturn"] * 100 for index in indices_data]
-        labels = [index["name"] for index in indices_data]
-        
-        plt.scatter(x, y, s=100, alpha=0.7)
-        
-        # Add index labels
-        for i, label in enumerate(labels):
-            plt.annotate(label, (x[i], y[i]), fontsize=8, 
-                         xytext=(5, 5), textcoords='offset points')
-        
-        plt.title("Risk-Return Profile of Global Indices (2013-2023)", fontsize=14, fontweight='bold')
-        plt.xlabel("Volatility (Annualized Standard Deviation, %)", fontsize=10)
-        plt.ylabel("Annualized Return (%)", fontsize=10)
-        plt.grid(True, alpha=0.3)
-        
-        # Add a diagonal line representing the efficient frontier (simplified)
-        min_x, max_x = plt.xlim()
-        min_y, max_y = plt.ylim()
-        plt.plot([min_x, max_x], [min_y, max_y], 'k--', alpha=0.3)
-    
-    elif chart_type == "individual":
-        # Plot performance chart for a single index
-        index = selected_indices[0]
-        dates = [pd.to_datetime(point['date']) for point in index['monthlyData']]
-        values = [point['value'] for point in index['monthlyData']]
-        # Calculate normalized values (starting at 100)
-        normalized_values = [value / values[0] * 100 for value in values]
-        
-        plt.plot(dates, normalized_values, label=index['name'], linewidth=2, color='#1e3c72')
-        plt.fill_between(dates, normalized_values, 100, alpha=0.2, color='#1e3c72')
-        
-        plt.title(f"{index['name']} Performance (2013-2023)", fontsize=14, fontweight='bold')
-        plt.xlabel("Year", fontsize=10)
-        plt.ylabel("Normalized Value (Starting = 100)", fontsize=10)
-        plt.grid(True, alpha=0.3)
-        plt.gca().xaxis.set_major_formatter(mdates.DateFormatter('%Y'))
-        plt.gca().xaxis.set_major_locator(mdates.YearLocator(2))
-    
-    plt.tight_layout()
-    
-    # Save figure to BytesIO object
-    img_data = BytesIO()
-    plt.savefig(img_data, format='png', dpi=300)
-    img_data.seek(0)
-    plt.close()
-    
-    return img_data
+    Args:
+        chart_images (dict or None): Chart image paths keyed by chart type or index symbol
+        key (str): Key of the chart in chart_images
+        indices_data, chart_type, filename, selected_indices, profile, placed_width:
+            See generate_chart
+    
+    Returns:
+        str or BytesIO: Chart image path or data
+    """
+    if chart_images and key in chart_images:
+        return chart_images[key]
+    return generate_chart(indices_data, chart_type, filename, selected_indices, profile, placed_width)
 
 # Generate the PDF report
-def generate_pdf_report(data_path, output_file):
+def generate_pdf_report(data_path, output_file, chart_images=None, profile=DEFAULT_PROFILE, currency=None):
     """Generate a professional PDF report with charts and analysis
     
     Args:
         data_path (str): Path to the data directory
         output_file (str): Output PDF filename
+        chart_images (dict, optional): Pre-rendered chart images keyed by
+            "performance", "volatility" or index symbol
+        profile (str): Name of the output profile
+        currency (str, optional): Report currency (e.g. "USD"); None keeps local currencies
     """
+    get_output_profile(profile)  # Fail early on an unknown profile
+    all_indices_file, summary_file = aggregate_file_names(currency)
+    
     # Load data
     try:
-        with open(os.path.join(data_path, "all_indices.json"), "r") as f:
+        with open(os.path.join(data_path, all_indices_file), "r") as f:
             indices_data = json.load(f)
         
-        with open(os.path.join(data_path, "summary.json"), "r") as f:
+        with open(os.path.join(data_path, summary_file), "r") as f:
             summary_data = json.load(f)
     except FileNotFoundError:
         print("Error: Data files not found. Please run data_fetcher.py first.")
@@ -217,7 +207,8 @@ def generate_pdf_report(data_path, output_file):
         leftMargin=0.5*inch, 
         rightMargin=0.5*inch,
         topMargin=0.5*inch, 
-        bottomMargin=0.5*inch
+        bottomMargin=0.5*inch,
+        pageCompression=1
     )
     
     # Get styles
@@ -232,6 +223,10 @@ def generate_pdf_report(data_path, output_file):
     # Add report date
     today = datetime.date.today().strftime("%B %d, %Y")
     elements.append(Paragraph(f"Report generated on {today}", styles["Caption"]))
+    elements.append(Paragraph(
+        f"All values and returns in {currency}" if currency else "All values and returns in local currency",
+        styles["Caption"]
+    ))
     elements.append(Spacer(1, 0.25*inch))
     
     # Add introduction
@@ -301,8 +296,11 @@ def generate_pdf_report(data_path, output_file):
         styles["CustomNormal"]
     ))
     
-    performance_chart = generate_chart(indices_data, "performance", "performance_comparison.png")
-    elements.append(Image(performance_chart, width=6.5*inch, height=4*inch))
+    performance_chart = get_chart_image(
+        chart_images, "performance", indices_data, "performance", "performance_comparison.png",
+        profile=profile, placed_width=CHART_WIDTH
+    )
+    elements.append(Image(performance_chart, width=CHART_WIDTH*inch, height=CHART_HEIGHT*inch))
     elements.append(Paragraph(
         "Figure 1: 10-Year Performance Comparison of Top 5 Global Indices (2013-2023)",
         styles["Caption"]
@@ -317,8 +315,11 @@ def generate_pdf_report(data_path, output_file):
         styles["CustomNormal"]
     ))
     
-    volatility_chart = generate_chart(indices_data, "volatility", "volatility_comparison.png")
-    elements.append(Image(volatility_chart, width=6.5*inch, height=4*inch))
+    volatility_chart = get_chart_image(
+        chart_images, "volatility", indices_data, "volatility", "volatility_comparison.png",
+        profile=profile, placed_width=CHART_WIDTH
+    )
+    elements.append(Image(volatility_chart, width=CHART_WIDTH*inch, height=CHART_HEIGHT*inch))
     elements.append(Paragraph(
         "Figure 2: Risk-Return Profile of Global Indices (2013-2023)",
         styles["Caption"]
@@ -337,7 +338,10 @@ def generate_pdf_report(data_path, output_file):
     best_data = []
     for i, index in enumerate(best_performers):
         # Generate chart
-        chart = generate_chart(indices_data, "individual", f"best_{i}.png", [index])
+        chart = get_chart_image(
+            chart_images, index["symbol"], indices_data, "individual", f"best_{i}.png", [index],
+            profile=profile, placed_width=THUMBNAIL_WIDTH
+        )
         
         # Performance metrics
         metrics = [
@@ -362,7 +366,7 @@ def generate_pdf_report(data_path, output_file):
         
         # Add to best data
         best_data.append([
-            Image(chart, width=3*inch, height=2*inch),
+            Image(chart, width=THUMBNAIL_WIDTH*inch, height=THUMBNAIL_HEIGHT*inch),
             metrics_table
         ])
     
@@ -409,7 +413,10 @@ def generate_pdf_report(data_path, output_file):
     worst_data = []
     for i, index in enumerate(worst_performers):
         # Generate chart
-        chart = generate_chart(indices_data, "individual", f"worst_{i}.png", [index])
+        chart = get_chart_image(
+            chart_images, index["symbol"], indices_data, "individual", f"worst_{i}.png", [index],
+            profile=profile, placed_width=THUMBNAIL_WIDTH
+        )
         
         # Performance metrics
         metrics = [
@@ -434,7 +441,7 @@ def generate_pdf_report(data_path, output_file):
         
         # Add to worst data
         worst_data.append([
-            Image(chart, width=3*inch, height=2*inch),
+            Image(chart, width=THUMBNAIL_WIDTH*inch, height=THUMBNAIL_HEIGHT*inch),
             metrics_table
         ])
     
@@ -611,6 +618,13 @@ def generate_pdf_report(data_path, output_file):
     print(f"PDF report generated successfully: {output_file}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the PDF report")
+    parser.add_argument("--profile", default=DEFAULT_PROFILE, choices=list(OUTPUT_PROFILES),
+                        help="Output profile controlling image resolution and compression")
+    parser.add_argument("--currency", default=None, choices=list(REPORT_CURRENCIES),
+                        help="Report currency (default: local currencies)")
+    args = parser.parse_args()
+    
     # Generate the PDF report
-    generate_pdf_report(DATA_PATH, OUTPUT_FILE)
+    generate_pdf_report(DATA_PATH, OUTPUT_FILE, profile=args.profile, currency=args.currency)
     print(f"PDF report saved to: {OUTPUT_FILE}")
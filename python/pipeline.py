@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+"""
+Incremental Build Pipeline for Stock Market Indices Analysis
+
+This script builds the report data, charts and PDF as a graph of stages:
+
+    fetch:<symbol> -> metrics:<symbol> -> aggregate -> charts -> pdf
+                                       -> chart:<symbol> ---------^
+    fx:<currency> ---------------------> currencies (USD/EUR aggregates)
+
+Every stage declares the files it reads and writes. A stage's fingerprint
+combines its parameters with the content hashes of its inputs (including the
+source files it runs), and is stored together with the hashes of its outputs.
+Like make, a rebuild only re-executes stages whose fingerprint or outputs
+changed, so a no-change rebuild does no work and a change to one ticker only
+redoes that ticker's downstream stages. Independent stages run in parallel;
+stages that call Yahoo Finance go through their own single-worker queue and
+are spaced out to avoid rate limiting.
+
+Heavy libraries are imported inside the stage actions, so checking an
+up-to-date build stays fast.
+"""
+
+import os
+import json
+import hashlib
+import sys
+import argparse
+import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from indices import INDICES, REPORT_CURRENCIES, BASE_CURRENCY, index_file_stem, aggregate_file_names
+from output_profiles import (OUTPUT_PROFILES, DEFAULT_PROFILE, IMAGE_EXTENSIONS, get_output_profile,
+                             CHART_WIDTH, THUMBNAIL_WIDTH)
+
+# Default locations (relative to the repository root)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BASE_DIR)
+DATA_PATH = os.path.join(ROOT_DIR, "src", "data")
+OUTPUT_FILE = os.path.join(ROOT_DIR, "Stock_Market_Indices_Report.pdf")
+# Intermediate build files (state, raw data, FX rates, accumulators, charts)
+# are kept out of src/data so they are not published with the site
+CACHE_PATH = os.path.join(ROOT_DIR, ".build")
+STATE_FILE_NAME = "pipeline_state.json"
+
+# Source files each kind of stage depends on
+FETCHER_SOURCES = [os.path.join(BASE_DIR, "data_fetcher.py")]
+METRICS_SOURCES = FETCHER_SOURCES + [os.path.join(BASE_DIR, "accumulators.py")]
+CURRENCY_SOURCES = FETCHER_SOURCES + [os.path.join(BASE_DIR, "currency.py")]
+CHART_SOURCES = [os.path.join(BASE_DIR, "chart_renderer.py"), os.path.join(BASE_DIR, "pdf_generator.py")]
+PDF_SOURCES = [os.path.join(BASE_DIR, "pdf_generator.py")]
+
+
+class Stage:
+    """A build step with declared inputs, outputs and parameters
+
+    Args:
+        name (str): Unique stage name
+        action (callable): Function run with no arguments to build the outputs
+        inputs (list): Files the stage reads
+        outputs (list): Files the stage writes
+        params (dict, optional): JSON-serializable parameters that affect the outputs
+        network (bool): Whether the stage makes requests to the data provider
+    """
+
+    def __init__(self, name, action, inputs=(), outputs=(), params=None, network=False):
+        self.name = name
+        self.action = action
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.params = params or {}
+        self.network = network
+
+
+class Pipeline:
+    """Run stages in dependency order, skipping those that are up to date
+
+    A failed stage keeps its previous outputs and is retried on the next run;
+    downstream stages still run on whatever inputs exist.
+
+    Network stages run on a separate pool of ``network_workers`` threads and
+    start at least ``network_delay`` seconds apart, so only the CPU stages
+    use the full ``max_workers`` parallelism.
+    """
+
+    def __init__(self, stages, state_file, max_workers=4, network_workers=1, network_delay=1.0):
+        self.stages = {stage.name: stage for stage in stages}
+        self.state_file = state_file
+        self.max_workers = max_workers
+        self.network_workers = network_workers
+        self.network_delay = network_delay
+        self.state = {"stages": {}, "files": {}}
+        self._network_lock = threading.Lock()
+        self._last_request = None
+
+        # Map every output to the stage that produces it
+        producers = {}
+        for stage in stages:
+            for path in stage.outputs:
+                producers[path] = stage.name
+        self.dependencies = {
+            stage.name: {producers[path] for path in stage.inputs if path in producers}
+            for stage in stages
+        }
+
+    def load_state(self):
+        try:
+            with open(self.state_file, "r") as f:
+                self.state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.state = {"stages": {}, "files": {}}
+
+    def save_state(self):
+        os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+        with open(self.state_file, "w") as f:
+            json.dump(self.state, f, indent=2, sort_keys=True)
+
+    def file_hash(self, path):
+        """Return the SHA-256 of a file, or None if it does not exist
+
+        Hashes are cached by modification time and size, so unchanged
+        files are not read again.
+        """
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+
+        key = os.path.relpath(path, ROOT_DIR)
+        cached = self.state["files"].get(key)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        self.state["files"][key] = [stat.st_mtime_ns, stat.st_size, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def fingerprint(self, stage):
+        """Combine the stage parameters with the hashes of its inputs"""
+        payload = {
+            "params": stage.params,
+            "inputs": {os.path.relpath(path, ROOT_DIR): self.file_hash(path) for path in stage.inputs},
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def output_hashes(self, stage):
+        return {os.path.relpath(path, ROOT_DIR): self.file_hash(path) for path in stage.outputs}
+
+    def is_up_to_date(self, stage, fingerprint):
+        record = self.state["stages"].get(stage.name)
+        return (
+            record is not None
+            and record["fingerprint"] == fingerprint
+            and record["outputs"] == self.output_hashes(stage)
+        )
+
+    def run_paced(self, action):
+        """Run a network action once the delay since the previous one has passed"""
+        with self._network_lock:
+            if self._last_request is not None:
+                delay = self._last_request + self.network_delay - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            self._last_request = time.monotonic()
+        action()
+
+    def run(self, force=False):
+        """Build every stage that is out of date
+
+        Args:
+            force (bool): Re-execute every stage regardless of fingerprints
+
+        Returns:
+            dict: Stage name -> "ran", "cached" or "failed"
+        """
+        self.load_state()
+        results = {}
+        pending = set(self.stages)
+        running = {}
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor, \
+                    ThreadPoolExecutor(max_workers=self.network_workers) as network_executor:
+                while pending or running:
+                    # Start or skip every stage whose dependencies have finished
+                    progressed = True
+                    while progressed:
+                        progressed = False
+                        for name in sorted(pending):
+                            if not self.dependencies[name] <= set(results):
+                                continue
+                            pending.discard(name)
+                            stage = self.stages[name]
+                            fingerprint = self.fingerprint(stage)
+                            if not force and self.is_up_to_date(stage, fingerprint):
+                                results[name] = "cached"
+                                progressed = True
+                            else:
+                                print(f"Running {name}...")
+                                if stage.network:
+                                    future = network_executor.submit(self.run_paced, stage.action)
+                                else:
+                                    future = executor.submit(stage.action)
+                                running[future] = (stage, fingerprint)
+
+                    if not running:
+                        if pending:
+                            raise RuntimeError(f"Unresolvable stage dependencies: {sorted(pending)}")
+                        break
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        stage, fingerprint = running.pop(future)
+                        try:
+                            future.result()
+                        except Exception as e:
+                            print(f"Error in {stage.name}: {str(e)}")
+                            self.state["stages"].pop(stage.name, None)
+                            results[stage.name] = "failed"
+                            continue
+                        self.state["stages"][stage.name] = {
+                            "fingerprint": fingerprint,
+                            "outputs": self.output_hashes(stage),
+                        }
+                        results[stage.name] = "ran"
+        finally:
+            self.save_state()
+
+        return results
+
+
+def load_json(path):
+    """Load a JSON file, returning None if it does not exist"""
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+# Stage actions
+
+def fetch_stage(index, raw_file):
+    from data_fetcher import fetch_monthly_data
+
+    write_json(raw_file, fetch_monthly_data(index))
+
+
+def metrics_stage(index, raw_file, index_file, accumulator_path, verify_history=False):
+    from data_fetcher import compute_index_metrics
+
+    monthly_data_list = load_json(raw_file)
+    if not monthly_data_list:
+        print(f"No data available for {index['name']}. Skipping...")
+        remove_file(index_file)
+        return
+    write_json(index_file, compute_index_metrics(index, monthly_data_list, accumulator_path, verify_history))
+
+
+def aggregate_stage(index_files, data_path):
+    from data_fetcher import write_aggregates
+
+    all_indices_data = [data for data in map(load_json, index_files) if data]
+    write_aggregates(all_indices_data, data_path)
+
+
+def fx_stage(currency, fx_file):
+    from currency import fetch_fx_series
+
+    write_json(fx_file, fetch_fx_series(currency))
+
+
+def currencies_stage(index_files, data_path, cache_path):
+    from data_fetcher import write_currency_aggregates
+
+    # Stale converted files are removed by write_currency_aggregates
+    all_indices_data = [data for data in map(load_json, index_files) if data]
+    write_currency_aggregates(all_indices_data, data_path, cache_path)
+
+
+def chart_stage(chart_type, data_file, chart_file, profile, placed_width):
+    from pdf_generator import generate_chart
+
+    data = load_json(data_file)
+    if not data:
+        remove_file(chart_file)
+        return
+
+    if chart_type == "individual":
+        image = generate_chart([data], chart_type, chart_file, [data], profile, placed_width)
+    else:
+        # Same ordering the report uses
+        data.sort(key=lambda x: x["totalReturn"], reverse=True)
+        image = generate_chart(data, chart_type, chart_file, None, profile, placed_width)
+
+    os.makedirs(os.path.dirname(chart_file), exist_ok=True)
+    with open(chart_file, "wb") as f:
+        f.write(image.getvalue())
+
+
+def pdf_stage(data_path, chart_files, output_file, profile, currency):
+    from pdf_generator import generate_pdf_report
+
+    chart_images = {key: path for key, path in chart_files.items() if os.path.exists(path)}
+    generate_pdf_report(data_path, output_file, chart_images, profile, currency)
+
+
+def build_stages(data_path=DATA_PATH, output_file=OUTPUT_FILE, build_date=None, profile=DEFAULT_PROFILE,
+                 currency=None, cache_path=CACHE_PATH, verify_history=False):
+    """Create the stage graph for the report
+
+    Args:
+        data_path (str): Directory of the data files
+        output_file (str): Output PDF filename
+        build_date (str, optional): Date of the build (YYYY-MM-DD); market data
+            is fetched again when it changes
+        profile (str): Name of the output profile
+        currency (str, optional): Report currency of the charts and PDF; None keeps local currencies
+        cache_path (str): Directory of the intermediate build files
+        verify_history (bool): Check the persisted metric accumulators against
+            the full history instead of only the newest bars
+
+    Returns:
+        list: Pipeline stages
+    """
+    if currency is not None and currency not in REPORT_CURRENCIES:
+        raise ValueError(f"Unknown report currency: {currency}")
+
+    build_date = build_date or datetime.date.today().strftime("%Y-%m-%d")
+    extension = IMAGE_EXTENSIONS[get_output_profile(profile)["image_format"]]
+    raw_path = os.path.join(cache_path, "raw")
+    fx_path = os.path.join(cache_path, "fx")
+    accumulator_dir = os.path.join(cache_path, "accumulators")
+    chart_path = os.path.join(cache_path, "charts", profile, currency or "local")
+    all_indices_file, summary_file = (
+        os.path.join(data_path, name) for name in aggregate_file_names()
+    )
+    # Data the charts and PDF are built from
+    report_indices_file, report_summary_file = (
+        os.path.join(data_path, name) for name in aggregate_file_names(currency)
+    )
+
+    stages = []
+    index_files = []
+    currency_index_files = []
+    chart_files = {}
+
+    for index in INDICES:
+        stem = index_file_stem(index["symbol"])
+        raw_file = os.path.join(raw_path, f"{stem}.json")
+        index_file = os.path.join(data_path, f"{stem}.json")
+        accumulator_path = os.path.join(accumulator_dir, f"{stem}.json")
+        chart_file = os.path.join(chart_path, f"{stem}.{extension}")
+        index_files.append(index_file)
+        chart_files[index["symbol"]] = chart_file
+
+        stages.append(Stage(
+            f"fetch:{index['symbol']}",
+            lambda index=index, raw_file=raw_file: fetch_stage(index, raw_file),
+            inputs=FETCHER_SOURCES,
+            outputs=[raw_file],
+            params={"index": index, "date": build_date},
+            network=True,
+        ))
+        stages.append(Stage(
+            f"metrics:{index['symbol']}",
+            lambda index=index, raw_file=raw_file, index_file=index_file, accumulator_path=accumulator_path:
+                metrics_stage(index, raw_file, index_file, accumulator_path, verify_history),
+            inputs=[raw_file] + METRICS_SOURCES,
+            outputs=[index_file, accumulator_path],
+            params={"index": index},
+        ))
+
+        # Each chart only depends on its own index, in the report currency
+        converted_files = {
+            report_currency: os.path.join(data_path, f"{stem}_{report_currency}.json")
+            for report_currency in REPORT_CURRENCIES
+        }
+        currency_index_files.extend(converted_files.values())
+        chart_input = converted_files[currency] if currency else index_file
+        stages.append(Stage(
+            f"chart:{index['symbol']}",
+            lambda chart_input=chart_input, chart_file=chart_file:
+                chart_stage("individual", chart_input, chart_file, profile, THUMBNAIL_WIDTH),
+            inputs=[chart_input] + CHART_SOURCES,
+            outputs=[chart_file],
+            params={"profile": get_output_profile(profile), "width": THUMBNAIL_WIDTH},
+        ))
+
+    stages.append(Stage(
+        "aggregate",
+        lambda: aggregate_stage(index_files, data_path),
+        inputs=index_files + FETCHER_SOURCES,
+        outputs=[all_indices_file, summary_file],
+    ))
+
+    # FX series are fetched once per build, then every currency is converted together
+    fx_currencies = sorted(({index["currency"] for index in INDICES} | set(REPORT_CURRENCIES)) - {BASE_CURRENCY})
+    fx_files = []
+    for fx_currency in fx_currencies:
+        fx_file = os.path.join(fx_path, f"{fx_currency}.json")
+        fx_files.append(fx_file)
+        stages.append(Stage(
+            f"fx:{fx_currency}",
+            lambda fx_currency=fx_currency, fx_file=fx_file: fx_stage(fx_currency, fx_file),
+            inputs=CURRENCY_SOURCES,
+            outputs=[fx_file],
+            params={"currency": fx_currency, "date": build_date},
+            network=True,
+        ))
+
+    stages.append(Stage(
+        "currencies",
+        lambda: currencies_stage(index_files, data_path, cache_path),
+        inputs=index_files + fx_files + CURRENCY_SOURCES,
+        outputs=currency_index_files + [
+            os.path.join(data_path, name)
+            for report_currency in REPORT_CURRENCIES
+            for name in aggregate_file_names(report_currency)
+        ],
+    ))
+
+    for chart_type in ("performance", "volatility"):
+        chart_file = os.path.join(chart_path, f"{chart_type}.{extension}")
+        chart_files[chart_type] = chart_file
+        stages.append(Stage(
+            f"chart:{chart_type}",
+            lambda chart_type=chart_type, chart_file=chart_file:
+                chart_stage(chart_type, report_indices_file, chart_file, profile, CHART_WIDTH),
+            inputs=[report_indices_file] + CHART_SOURCES,
+            outputs=[chart_file],
+            params={"profile": get_output_profile(profile), "width": CHART_WIDTH},
+        ))
+
+    stages.append(Stage(
+        "pdf",
+        lambda: pdf_stage(data_path, chart_files, output_file, profile, currency),
+        inputs=[report_indices_file, report_summary_file] + list(chart_files.values()) + PDF_SOURCES,
+        outputs=[output_file],
+        params={"date": build_date, "profile": get_output_profile(profile), "currency": currency},
+    ))
+
+    return stages
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incrementally build the report data, charts and PDF")
+    parser.add_argument("--data", default=DATA_PATH, help="Data directory")
+    parser.add_argument("--output", default=OUTPUT_FILE, help="Output PDF file")
+    parser.add_argument("--cache", default=CACHE_PATH, help="Directory of the intermediate build files")
+    parser.add_argument("--workers", type=int, default=4, help="Stages run in parallel")
+    parser.add_argument("--network-delay", type=float, default=1.0,
+                        help="Seconds between requests to the data provider")
+    parser.add_argument("--force", action="store_true",
+                        help="Rebuild every stage and check the metric accumulators against the full history")
+    parser.add_argument("--profile", default=DEFAULT_PROFILE, choices=list(OUTPUT_PROFILES),
+                        help="Output profile controlling image resolution and compression")
+    parser.add_argument("--currency", default=None, choices=list(REPORT_CURRENCIES),
+                        help="Report currency of the charts and PDF (default: local currencies)")
+    args = parser.parse_args()
+
+    pipeline = Pipeline(
+        build_stages(args.data, args.output, profile=args.profile, currency=args.currency,
+                     cache_path=args.cache, verify_history=args.force),
+        os.path.join(args.cache, STATE_FILE_NAME),
+        max_workers=args.workers,
+        network_delay=args.network_delay,
+    )
+    results = pipeline.run(force=args.force)
+
+    counts = {status: list(results.values()).count(status) for status in ("ran", "cached", "failed")}
+    print("\nBuild Complete!")
+    print(f"Stages run: {counts['ran']}, up to date: {counts['cached']}, failed: {counts['failed']}")
+
+    if counts["failed"]:
+        failed = sorted(name for name, status in results.items() if status == "failed")
+        print(f"Failed stages: {', '.join(failed)}")
+        sys.exit(1)
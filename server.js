@@ -8,6 +8,13 @@ const fs = require('fs');
 const app = express();
 const PORT = process.env.PORT || 3000;
 
+// Output profiles accepted by python/pdf_generator.py
+const OUTPUT_PROFILES = ['screen', 'print', 'archive'];
+const DEFAULT_PROFILE = 'print';
+
+// Report currencies accepted by python/pdf_generator.py (omit for local currencies)
+const REPORT_CURRENCIES = ['USD', 'EUR'];
+
 // Middleware
 app.use(cors());
 app.use(bodyParser.json());
@@ -15,10 +22,33 @@ app.use(express.static('./'));
 
 // API endpoint for PDF generation
 app.post('/generate-pdf', (req, res) => {
-    console.log('Received PDF generation request');
+    const profile = (req.body && req.body.profile) || DEFAULT_PROFILE;
+    console.log(`Received PDF generation request (profile: ${profile})`);
+    
+    if (!OUTPUT_PROFILES.includes(profile)) {
+        return res.status(400).json({
+            success: false,
+            message: `Unknown output profile: ${profile}`,
+            profiles: OUTPUT_PROFILES
+        });
+    }
+    
+    const currency = req.body && req.body.currency;
+    if (currency && !REPORT_CURRENCIES.includes(currency)) {
+        return res.status(400).json({
+            success: false,
+            message: `Unknown report currency: ${currency}`,
+            currencies: REPORT_CURRENCIES
+        });
+    }
+    
+    const args = ['python/pdf_generator.py', '--profile', profile];
+    if (currency) {
+        args.push('--currency', currency);
+    }
     
     // Spawn the Python process
-    const pythonProcess = spawn('python', ['python/pdf_generator.py']);
+    const pythonProcess = spawn('python', args);
     
     let outputData = '';
     let errorData = '';